@@ -1,6 +1,7 @@
 """Snakemake script: plot player scores per gameweek.
 
-Reads a player JSON from snakemake.input[0] and writes a PNG to snakemake.output[0].
+Reads each player JSON in snakemake.input and writes the matching PNG in
+snakemake.output.
 
 This file is intended to be used from a Snakemake rule with `script:`.
 """
@@ -11,15 +12,43 @@ import sys
 from typing import List, Tuple, Dict
 
 import matplotlib
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional speedup; fall back to the stdlib json module
+    orjson = None
 
 # Use a non-interactive backend which is safe in CI/envs without display
 matplotlib.use("Agg")
-import matplotlib.pyplot as plt
+# The object-oriented Figure API avoids importing pyplot and its global
+# state machine, which is the bulk of matplotlib's import time.
+from matplotlib.figure import Figure
+
+# single figure reused for every plot rendered by this process
+_FIGURE = None
+
+
+def _get_figure(width: float, height: float) -> Figure:
+    """Return the shared figure, cleared and resized to (width, height) inches."""
+    global _FIGURE
+    if _FIGURE is None:
+        _FIGURE = Figure()
+    _FIGURE.clear()
+    _FIGURE.set_size_inches(width, height)
+    return _FIGURE
 
 
 def read_player(path: Path) -> Dict:
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    data = path.read_bytes()
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def _as_int(value, default=None):
+    try:
+        return int(value)
+    except Exception:
+        return default
 
 
 def extract_gameweek_scores(player: Dict) -> Tuple[List[int], List[int]]:
@@ -29,65 +58,67 @@ def extract_gameweek_scores(player: Dict) -> Tuple[List[int], List[int]]:
     - Sort by event number.
     """
     history = player.get("history", [])
-    rows = []
-    for entry in history:
-        event = entry.get("event")
-        score = entry.get("total_score")
-        # skip aggregated season totals where event is null
-        if event is None:
-            continue
-        try:
-            event_i = int(event)
-        except Exception:
-            continue
-        try:
-            score_i = int(score)
-        except Exception:
-            # if score missing or invalid, use 0
-            score_i = 0
-        rows.append((event_i, score_i))
-    # sort by event
-    rows.sort(key=lambda x: x[0])
+    # skip aggregated season totals where event is null (or not a number)
+    rows = [
+        (event, entry)
+        for entry in history
+        if (event := _as_int(entry.get("event"))) is not None
+    ]
     if not rows:
         return [], []
-    gw, scores = zip(*rows)
-    return list(gw), list(scores)
+    events = np.fromiter((event for event, _ in rows), dtype=np.int32, count=len(rows))
+    # if score missing or invalid, use 0
+    scores = np.fromiter(
+        (_as_int(entry.get("total_score"), 0) for _, entry in rows),
+        dtype=np.int32,
+        count=len(rows),
+    )
+    order = np.argsort(events, kind="stable")
+    return events[order].tolist(), scores[order].tolist()
 
 
 def plot_scores(
     gameweeks: List[int], scores: List[int], player_name: str, outpath: Path
 ) -> None:
-    plt.figure(figsize=(max(6, len(gameweeks) * 0.6), 4))
-    plt.bar(gameweeks, scores, color="#1f77b4")
-    plt.xlabel("Gameweek")
-    plt.ylabel("Total points")
-    plt.title(f"{player_name} — gameweek points")
-    plt.xticks(gameweeks)
-    plt.tight_layout()
+    fig = _get_figure(max(6, len(gameweeks) * 0.6), 4)
+    ax = fig.add_subplot()
+    ax.bar(gameweeks, scores, color="#1f77b4")
+    ax.set_xlabel("Gameweek")
+    ax.set_ylabel("Total points")
+    ax.set_title(f"{player_name} — gameweek points")
+    ax.set_xticks(gameweeks)
+    fig.tight_layout()
     outpath.parent.mkdir(parents=True, exist_ok=True)
-    plt.savefig(outpath)
-    plt.close()
+    fig.savefig(outpath)
 
 
-def main():
-    inp = Path(str(snakemake.input[0]))
-    outp = Path(str(snakemake.output[0]))
+def plot_empty(outpath: Path) -> None:
+    fig = _get_figure(6, 3)
+    ax = fig.add_subplot()
+    ax.text(0.5, 0.5, "No gameweek history available", ha="center", va="center")
+    ax.axis("off")
+    outpath.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(outpath)
+
 
+def render(inp: Path, outp: Path) -> None:
+    """Plot the player JSON at inp to the PNG at outp."""
     player = read_player(inp)
     gw, scores = extract_gameweek_scores(player)
     player_name = player.get("name") or player.get("web_name") or inp.stem
     if not gw:
         # create an empty figure with message
-        plt.figure(figsize=(6, 3))
-        plt.text(0.5, 0.5, "No gameweek history available", ha="center", va="center")
-        plt.axis("off")
-        outp.parent.mkdir(parents=True, exist_ok=True)
-        plt.savefig(outp)
-        plt.close()
+        plot_empty(outp)
         return
 
     plot_scores(gw, scores, player_name, outp)
 
 
+def main():
+    # snakemake may pass several players to one job; they share one figure
+    for inp, outp in zip(snakemake.input, snakemake.output):
+        render(Path(str(inp)), Path(str(outp)))
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,142 @@
+"""HTTP helpers for the public FPL API.
+
+All requests go through one shared `requests.Session`, so repeated calls reuse
+pooled keep-alive connections and share a single retry policy.
+"""
+import gzip
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+
+from myfpl.jsonio import loads
+
+FPL_BASE = "https://fantasy.premierleague.com/api"
+
+# seconds a cached element-summary is used without revalidating it
+SUMMARY_CACHE_TTL = 3600
+# default on-disk cache for element-summary responses, shared by the CLIs
+SUMMARY_CACHE_DIR = os.path.join("~", ".cache", "myfpl", "element-summary")
+
+# connections kept alive per host; matches the number of concurrent fetchers
+POOL_SIZE = 8
+
+# Retry transient failures with capped exponential backoff. The random jitter
+# keeps parallel fetchers from retrying in lockstep, and a 429/503 Retry-After
+# header from the API takes precedence over the computed delay.
+_RETRY = Retry(
+    total=2,
+    backoff_factor=0.3,
+    backoff_max=5.0,
+    backoff_jitter=0.3,
+    status_forcelist=[429, 500, 502, 503, 504],
+    respect_retry_after_header=True,
+)
+
+
+def _make_session() -> requests.Session:
+    session = requests.Session()
+    session.headers["User-Agent"] = "myfpl-fetcher/1.0"
+    # advertise every content-encoding urllib3 can decode here: gzip/deflate
+    # always, br/zstd when brotli/zstandard are installed
+    session.headers.update(make_headers(accept_encoding=True))
+    adapter = HTTPAdapter(
+        pool_connections=POOL_SIZE,
+        pool_maxsize=POOL_SIZE,
+        max_retries=_RETRY,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_SESSION = _make_session()
+
+
+def fetch_json(url: str) -> Dict:
+    r = _SESSION.get(url, timeout=20)
+    r.raise_for_status()
+    return loads(r.content)
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def fetch_json_cached(url: str, cache_dir: str, ttl: float = 3600) -> Dict:
+    """Fetch JSON from url through an on-disk cache in cache_dir.
+
+    Responses are stored gzipped as `<key>.json.gz` next to a `<key>.meta` file
+    holding the fetch time and validators. Entries younger than `ttl` seconds
+    are served from disk; older ones are revalidated with If-None-Match /
+    If-Modified-Since, and a 304 reuses the stored body.
+    """
+    key = hashlib.blake2b(url.encode("utf-8"), digest_size=8).hexdigest()
+    body_path = os.path.join(cache_dir, f"{key}.json.gz")
+    meta_path = os.path.join(cache_dir, f"{key}.meta")
+
+    meta = {}
+    if os.path.exists(body_path):
+        try:
+            with open(meta_path, "rb") as f:
+                meta = loads(f.read())
+        except (OSError, ValueError):
+            meta = {}
+
+    if meta and time.time() - meta.get("fetched", 0) < ttl:
+        with gzip.open(body_path, "rb") as f:
+            return loads(f.read())
+
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    r = _SESSION.get(url, headers=headers, timeout=20)
+
+    not_modified = r.status_code == 304
+    if not_modified:
+        with gzip.open(body_path, "rb") as f:
+            body = f.read()
+    else:
+        r.raise_for_status()
+        body = r.content
+        meta = {
+            "url": url,
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+        }
+    data = loads(body)
+
+    # caching is best-effort; a failed write only costs a refetch next time
+    meta["fetched"] = time.time()
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        if not not_modified:
+            _write_bytes(body_path, gzip.compress(body))
+        _write_bytes(meta_path, json.dumps(meta).encode("utf-8"))
+    except OSError:
+        pass
+    return data
+
+
+def fetch_summary(pid: int, cache_dir: str) -> Tuple[Optional[Dict], Optional[Exception]]:
+    """Fetch the element-summary for pid, returning (summary, error).
+
+    Errors are returned rather than raised so one failed player does not
+    abort a pool of concurrent fetches.
+    """
+    try:
+        url = f"{FPL_BASE}/element-summary/{pid}/"
+        return fetch_json_cached(url, os.path.expanduser(cache_dir), ttl=SUMMARY_CACHE_TTL), None
+    except Exception as e:
+        return None, e
@@ -4,19 +4,40 @@
 This module centralizes downloading, saving and mapping of fixtures so other
 modules (like player_history) can reuse the logic.
 """
-import json
 import os
 import time
-import urllib.request
-import urllib.error
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Tuple
 import click
 
-FPL_BASE = "https://fantasy.premierleague.com/api"
+from myfpl.api import FPL_BASE, fetch_json
+from myfpl.jsonio import loads, write_json
+
+# a saved fixtures.json younger than this (seconds) is used instead of refetching
+FIXTURES_MAX_AGE = 3600
+
+# fixtures.json path -> (time loaded, fixtures_map); shared by calls in one process
+_FIXTURES_MAPS: Dict[str, Tuple[float, Dict[int, dict]]] = {}
+
+
+def _read_fixtures(path: str) -> List[dict]:
+    with open(path, "rb") as f:
+        return loads(f.read())
 
 
 def parse_kickoff(iso: str) -> str:
+    # FPL sends canonical UTC timestamps ("YYYY-MM-DDTHH:MM:SSZ"); rewriting the
+    # suffix gives the same string as the datetime round-trip below
+    if (
+        len(iso) == 20
+        and iso[19] == "Z"
+        and iso[4] == "-"
+        and iso[7] == "-"
+        and iso[10] == "T"
+        and iso[13] == ":"
+        and iso[16] == ":"
+    ):
+        return iso[:19] + "+00:00"
     try:
         dt = datetime.fromisoformat(iso.replace("Z", "+00:00"))
         return dt.isoformat()
@@ -24,26 +45,6 @@ def parse_kickoff(iso: str) -> str:
         return iso
 
 
-def fetch_json(url: str, retries: int = 2, backoff: float = 0.3) -> List[dict]:
-    req = urllib.request.Request(url, headers={"User-Agent": "myfpl-fetcher/1.0"})
-    for attempt in range(retries + 1):
-        try:
-            with urllib.request.urlopen(req, timeout=20) as r:
-                return json.load(r)
-        except urllib.error.HTTPError as e:
-            if 400 <= e.code < 500:
-                raise
-            if attempt < retries:
-                time.sleep(backoff * (attempt + 1))
-                continue
-            raise
-        except Exception:
-            if attempt < retries:
-                time.sleep(backoff * (attempt + 1))
-                continue
-            raise
-
-
 def build_fixtures_map(fixtures: List[dict]) -> Dict[int, dict]:
     """Return a mapping fixture_id -> dict with event, kickoff_time and teams."""
     m = {}
@@ -60,6 +61,9 @@ def build_fixtures_map(fixtures: List[dict]) -> Dict[int, dict]:
 def get_fixtures_map(output_dir: str, no_fetch: bool = False) -> Dict[int, dict]:
     """Return fixtures_map. If no_fetch is False, fetch from API and save to output_dir.
 
+    A `fixtures.json` in output_dir younger than FIXTURES_MAX_AGE is reused
+    instead of fetching, and the resulting map is memoized for the same period.
+
     If no_fetch is True, try to load an existing `fixtures.json` from output_dir. If
     the file isn't present, return an empty dict.
     """
@@ -67,23 +71,44 @@ def get_fixtures_map(output_dir: str, no_fetch: bool = False) -> Dict[int, dict]
     if no_fetch:
         if os.path.exists(fixtures_path):
             try:
-                with open(fixtures_path, "r", encoding="utf-8") as f:
-                    fixtures = json.load(f)
-                return build_fixtures_map(fixtures)
+                return build_fixtures_map(_read_fixtures(fixtures_path))
             except Exception:
                 return {}
         return {}
 
-    # fetch from API and save
-    fixtures = fetch_json(f"{FPL_BASE}/fixtures/")
+    now = time.time()
+    key = os.path.abspath(fixtures_path)
+    cached = _FIXTURES_MAPS.get(key)
+    if cached and now - cached[0] < FIXTURES_MAX_AGE:
+        return cached[1]
+
+    fmap = None
     try:
-        os.makedirs(output_dir, exist_ok=True)
-        with open(fixtures_path, "w", encoding="utf-8") as f:
-            json.dump(fixtures, f, ensure_ascii=False, indent=2)
-    except Exception:
-        # saving is best-effort; still return the map
+        if now - os.stat(fixtures_path).st_mtime < FIXTURES_MAX_AGE:
+            fixtures = _read_fixtures(fixtures_path)
+            # only a raw fixture list can be reused; `fixtures.py --output
+            # fixtures.json` overwrites it with the parsed map (a dict)
+            if isinstance(fixtures, list):
+                fmap = build_fixtures_map(fixtures)
+    except (OSError, ValueError, AttributeError):
+        # missing, unreadable or not a raw fixture list; fetch below
         pass
-    return build_fixtures_map(fixtures)
+
+    if fmap is None:
+        # fetch from API and save
+        fixtures = fetch_json(f"{FPL_BASE}/fixtures/")
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            # atomic, so a concurrent or interrupted run never leaves a
+            # truncated file that still looks fresh
+            write_json(fixtures_path, fixtures)
+        except Exception:
+            # saving is best-effort; still return the map
+            pass
+        fmap = build_fixtures_map(fixtures)
+
+    _FIXTURES_MAPS[key] = (now, fmap)
+    return fmap
 
 
 @click.command()
@@ -112,8 +137,7 @@ def cli(out_path: str, no_fetch: bool):
 
     try:
         os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(fmap, f, ensure_ascii=False, indent=2)
+        write_json(out_path, fmap)
         click.echo(f"Wrote parsed fixtures_map to {out_path}")
     except Exception as e:
         click.echo(f"Failed to write fixtures_map to {out_path}: {e}", err=True)
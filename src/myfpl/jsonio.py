@@ -0,0 +1,59 @@
+"""JSON encoding, decoding and file helpers shared by the myfpl scripts.
+
+Kept free of third-party imports (orjson is optional) so the CLIs and the
+HTTP layer can use it without paying for each other's dependencies.
+"""
+import json
+import mmap
+import os
+
+try:
+    import orjson
+except ImportError:  # optional speedup; fall back to the stdlib json module
+    orjson = None
+
+loads = orjson.loads if orjson else json.loads
+
+
+def dumps(obj) -> bytes:
+    """Serialize obj to indented UTF-8 JSON bytes."""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def dumps_line(obj) -> bytes:
+    """Serialize obj to a compact, newline-terminated JSON record."""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def write_json(path: str, obj) -> None:
+    """Atomically write obj to path as indented JSON.
+
+    The payload is serialized up front and written unbuffered to a temporary
+    file in one call, then moved into place with os.replace so readers never
+    see a partial file. No fsync: the outputs can always be regenerated.
+    """
+    data = memoryview(dumps(obj))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb", buffering=0) as f:
+        # raw writes may be short; loop until the whole payload is out
+        while data:
+            data = data[f.write(data):]
+    os.replace(tmp_path, path)
+
+
+def load_bootstrap(path: str):
+    with open(path, "rb") as f:
+        if orjson is None:
+            return json.loads(f.read())
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped; let the parser report the error
+            return orjson.loads(f.read())
+        # orjson parses straight from the mapped pages, skipping the bytes copy
+        with mm, memoryview(mm) as view:
+            return orjson.loads(view)
@@ -1,115 +1,22 @@
 #!/usr/bin/env python3
 """Combined player metadata + per-gameweek history extractor for FPL bootstrap + API."""
 
-import json
 import os
-import re
-import time
-import unicodedata
-import urllib.request
-import urllib.error
-from difflib import get_close_matches
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List
 
 import click
+from myfpl.jsonio import loads, write_json
+from myfpl.api import FPL_BASE, SUMMARY_CACHE_DIR, fetch_summary
 from myfpl.fixtures import get_fixtures_map, build_fixtures_map
+from myfpl.player_data import (
+    find_players,
+    load_bootstrap_cached,
+    sanitize_filename,
+)
 
-FPL_BASE = "https://fantasy.premierleague.com/api"
-
-
-def sanitize_filename(name: str) -> str:
-    s = unicodedata.normalize("NFKD", name)
-    s = "".join(ch for ch in s if not unicodedata.combining(ch))
-    s = s.lower()
-    s = re.sub(r"\s+", "_", s)
-    s = re.sub(r"[^a-z0-9_]", "", s)
-    return s
-
-
-def load_bootstrap(path: str) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def fetch_json(url: str, retries: int = 2, backoff: float = 0.3) -> Dict:
-    req = urllib.request.Request(url, headers={"User-Agent": "myfpl-fetcher/1.0"})
-    for attempt in range(retries + 1):
-        try:
-            with urllib.request.urlopen(req, timeout=20) as r:
-                return json.load(r)
-        except urllib.error.HTTPError as e:
-            if 400 <= e.code < 500:
-                raise
-            if attempt < retries:
-                time.sleep(backoff * (attempt + 1))
-                continue
-            raise
-        except Exception:
-            if attempt < retries:
-                time.sleep(backoff * (attempt + 1))
-                continue
-            raise
-
-
-def parse_kickoff(iso: str) -> str:
-    try:
-        dt = datetime.fromisoformat(iso.replace("Z", "+00:00"))
-        return dt.isoformat()
-    except Exception:
-        return iso
-
-
-def build_position_map(bootstrap: dict) -> dict:
-    pos_map = {}
-    for et in bootstrap.get("element_types", []):
-        pos_map[et["id"]] = et.get("singular_name") or et.get("singular_name_short")
-    return pos_map
-
-
-def build_team_map(bootstrap: dict) -> dict:
-    tm = {}
-    for t in bootstrap.get("teams", []):
-        tm[t["id"]] = {
-            "id": t.get("id"),
-            "name": t.get("name"),
-            "short_name": t.get("short_name"),
-            "code": t.get("code"),
-        }
-    return tm
-
-
-def find_players(bootstrap: dict, query: str) -> list:
-    q = query.strip().lower()
-    elements = bootstrap.get("elements", [])
-    name_to_elems = {}
-    candidates = []
-    for el in elements:
-        web = (el.get("web_name") or "").strip()
-        full = (
-            (el.get("first_name") or "") + " " + (el.get("second_name") or "")
-        ).strip()
-        alt = (el.get("second_name") or "").strip()
-        first = (el.get("first_name") or "").strip()
-        for nm in {web, full, alt, first}:
-            if not nm:
-                continue
-            key = nm.lower()
-            name_to_elems.setdefault(key, []).append(el)
-            candidates.append(key)
-    if q in name_to_elems:
-        return list({el["id"]: el for el in name_to_elems[q]}.values())
-    substring_keys = [name for name in candidates if q in name]
-    if substring_keys:
-        seen = {}
-        for key in substring_keys:
-            for el in name_to_elems.get(key, []):
-                seen[el["id"]] = el
-        return list(seen.values())
-    close = get_close_matches(q, candidates, n=1, cutoff=0.6)
-    if close:
-        return list({el["id"]: el for el in name_to_elems[close[0]]}.values())
-    return []
+# number of element-summary requests kept in flight at once
+SUMMARY_WORKERS = 8
 
 
 def _extract_gameweek_stats(
@@ -176,7 +83,15 @@ def _extract_gameweek_stats(
     "--keep-summaries",
     is_flag=True,
     default=False,
-    help="Do not remove downloaded element_{id}_summary.json files (useful for debugging)",
+    help="Also write the raw element_{id}_summary.json files to OUTPUT_DIR (useful for debugging)",
+)
+@click.option(
+    "--cache-dir",
+    "cache_dir",
+    default=SUMMARY_CACHE_DIR,
+    show_default=True,
+    type=click.Path(file_okay=False, dir_okay=True),
+    help="Directory used to cache element-summary responses between runs",
 )
 @click.option(
     "--verbose",
@@ -191,18 +106,19 @@ def cli(
     fixtures_path: str,
     no_fetch: bool,
     keep_summaries: bool,
+    cache_dir: str,
     verbose: bool,
 ):
     if not os.path.exists(bootstrap_path):
         click.echo(f"bootstrap file not found: {bootstrap_path}", err=True)
         raise SystemExit(2)
     try:
-        boot = load_bootstrap(bootstrap_path)
+        boot, pos_map, team_map, name_index = load_bootstrap_cached(bootstrap_path)
     except Exception as e:
         click.echo(f"Failed to load bootstrap file: {e}", err=True)
         raise SystemExit(3)
 
-    matches = find_players(boot, player)
+    matches = find_players(boot, player, name_index)
     if not matches:
         click.echo(f"Player not found for query: '{player}'", err=True)
         raise SystemExit(1)
@@ -213,8 +129,8 @@ def cli(
     fixtures_map = {}
     if fixtures_path:
         try:
-            with open(fixtures_path, "r", encoding="utf-8") as f:
-                fixtures = json.load(f)
+            with open(fixtures_path, "rb") as f:
+                fixtures = loads(f.read())
             # Accept either a raw fixtures list (from the FPL API) or a pre-built fixtures_map
             if isinstance(fixtures, dict):
                 # assume it's already a fixtures_map: fixture_id -> {event,..}
@@ -249,8 +165,16 @@ def cli(
                     "Failed to fetch fixtures; continuing without fixture mapping"
                 )
 
-    pos_map = build_position_map(boot)
-    team_map = build_team_map(boot)
+    # fetch all element-summaries up front so the network round-trips overlap
+    summaries = {}
+    if not no_fetch:
+        ids = [el.get("id") for el in matches]
+        if verbose:
+            for pid in ids:
+                click.echo(f"Fetching element-summary from {FPL_BASE}/element-summary/{pid}/")
+        with ThreadPoolExecutor(max_workers=min(SUMMARY_WORKERS, len(ids))) as ex:
+            results = ex.map(lambda pid: fetch_summary(pid, cache_dir), ids)
+            summaries = dict(zip(ids, results))
 
     written = []
     for el in matches:
@@ -268,28 +192,28 @@ def cli(
 
         team_info = team_map.get(el.get("team")) or {"id": el.get("team")}
 
-        # fetch element-summary for per-gameweek history unless disabled
+        # use the prefetched element-summary for per-gameweek history
         history_raw = []
-        summary_file = None
         if not no_fetch:
-            url = f"{FPL_BASE}/element-summary/{pid}/"
-            try:
-                if verbose:
-                    click.echo(f"Fetching element-summary from {url}")
-                summary = fetch_json(url)
+            summary, error = summaries[pid]
+            if error is not None:
+                click.echo(
+                    f"Warning: failed to fetch element-summary for id={pid}: {error}",
+                    err=True,
+                )
+            else:
                 # Some responses include `history` (current season) and/or `history_past`.
                 # Combine both so we don't lose data when one is empty.
                 hist_cur = summary.get("history") or []
                 hist_past = summary.get("history_past") or []
                 history_raw = list(hist_cur) + list(hist_past)
-                # save raw element-summary to a temp file which we'll remove after use
-                summary_file = os.path.join(output_dir, f"element_{pid}_summary.json")
-                try:
-                    with open(summary_file, "w", encoding="utf-8") as f:
-                        json.dump(summary, f, ensure_ascii=False, indent=2)
-                except Exception as e:
-                    # non-fatal if we cannot save the summary
-                    if verbose:
+                # the response is cached in cache_dir; only copy it out on request
+                if keep_summaries:
+                    summary_file = os.path.join(output_dir, f"element_{pid}_summary.json")
+                    try:
+                        write_json(summary_file, summary)
+                    except Exception as e:
+                        # non-fatal if we cannot save the summary
                         click.echo(
                             f"Warning: failed to write element summary to {summary_file}: {e}",
                             err=True,
@@ -302,11 +226,6 @@ def cli(
                         click.echo(
                             f"Debug: element-summary response keys: {list(summary.keys())}"
                         )
-            except Exception as e:
-                click.echo(
-                    f"Warning: failed to fetch element-summary for id={pid}: {e}",
-                    err=True,
-                )
 
         history = _extract_gameweek_stats(history_raw, fixtures_map)
 
@@ -325,22 +244,10 @@ def cli(
         base = sanitize_filename(full_name or el.get("web_name") or f"player_{pid}")
         filename = f"{base}_{pid}.json" if len(matches) > 1 else f"{base}.json"
         out_path = os.path.join(output_dir, filename)
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(out, f, ensure_ascii=False, indent=2)
+        write_json(out_path, out)
         written.append(out_path)
         click.echo(f"Wrote {out_path}")
 
-        # remove temporary element summary file if we created one (unless user asked to keep)
-        if summary_file and not keep_summaries:
-            try:
-                if os.path.exists(summary_file):
-                    os.remove(summary_file)
-            except Exception as e:
-                click.echo(
-                    f"Warning: failed to remove temporary file {summary_file}: {e}",
-                    err=True,
-                )
-
     click.echo(f"Wrote {len(written)} player file(s).")
 
 
@@ -7,177 +7,257 @@ This script uses click and options. Example:
 The output is a JSON file named after the player (lowercase, spaces -> underscores,
 diacritics removed) containing name, position, cost, total_points and expanded stats.
 """
-import json
 import os
+import pickle
 import re
-import time
 import unicodedata
-import urllib.request
-import urllib.error
+from collections import namedtuple
 from difflib import get_close_matches
-from datetime import datetime
-from typing import Dict, List
+from functools import lru_cache
 
 import click
 
+from myfpl.jsonio import dumps_line, load_bootstrap, write_json
 
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:  # optional speedup; fall back to difflib
+    process = None
+
+_RE_WS = re.compile(r"\s+")
+_RE_KEEP = re.compile(r"[^a-z0-9_]")
+
+
+@lru_cache(maxsize=4096)
 def sanitize_filename(name: str) -> str:
-    # Normalize unicode (decompose characters) and remove diacritics
-    s = unicodedata.normalize("NFKD", name)
-    # Remove combining marks (accents)
-    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    s = name
+    if not s.isascii():
+        # Normalize unicode (decompose characters) and remove diacritics
+        s = unicodedata.normalize("NFKD", s)
+        # Remove combining marks (accents)
+        combining = unicodedata.combining
+        s = "".join([ch for ch in s if not combining(ch)])
     s = s.lower()
-    s = re.sub(r"\s+", "_", s)
+    s = _RE_WS.sub("_", s)
     # Keep only ascii letters, numbers and underscores
-    s = re.sub(r"[^a-z0-9_]", "", s)
+    s = _RE_KEEP.sub("", s)
     return s
 
 
-def load_bootstrap(path: str):
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+# parsed bootstrap plus the lookup structures derived from it
+BootstrapData = namedtuple("BootstrapData", ["boot", "pos_map", "team_map", "name_index"])
 
+# bump whenever the layout of the cached data changes
+_CACHE_VERSION = 6
 
-FPL_BASE = "https://fantasy.premierleague.com/api"
+# the only bootstrap sections the CLIs read; everything else (events, phases,
+# game_settings, chips, ...) is dropped before caching
+_BOOTSTRAP_SECTIONS = ("element_types", "teams", "elements")
 
 
-def fetch_json(url: str, retries: int = 2, backoff: float = 0.3) -> Dict:
-    req = urllib.request.Request(url, headers={"User-Agent": "myfpl-fetcher/1.0"})
-    for attempt in range(retries + 1):
-        try:
-            with urllib.request.urlopen(req, timeout=20) as r:
-                return json.load(r)
-        except urllib.error.HTTPError as e:
-            # 404 or 5xx - no point retrying some errors
-            if 400 <= e.code < 500:
-                raise
-            if attempt < retries:
-                time.sleep(backoff * (attempt + 1))
-                continue
-            raise
-        except Exception:
-            if attempt < retries:
-                time.sleep(backoff * (attempt + 1))
-                continue
-            raise
+def load_bootstrap_cached(path: str) -> BootstrapData:
+    """Load the bootstrap file together with its position/team/name lookups.
 
-
-def parse_kickoff(iso: str) -> str:
+    Only the sections in _BOOTSTRAP_SECTIONS are kept. The result is pickled
+    to `<path>.cache.pkl`, keyed on the bootstrap's mtime and size, so repeated
+    invocations on an unchanged file skip the JSON parse and the index building
+    entirely.
+    """
+    st = os.stat(path)
+    header = (_CACHE_VERSION, st.st_mtime_ns, st.st_size)
+    cache_path = path + ".cache.pkl"
     try:
-        # keep original timezone info if present
-        dt = datetime.fromisoformat(iso.replace("Z", "+00:00"))
-        return dt.isoformat()
+        with open(cache_path, "rb") as f:
+            if pickle.load(f) == header:
+                return BootstrapData(*pickle.load(f))
     except Exception:
-        return iso
-
-
-def build_position_map(bootstrap: dict) -> dict:
-    # map element_type id -> readable position
-    pos_map = {}
-    for et in bootstrap.get("element_types", []):
-        # prefer singular_name (e.g. 'Goalkeeper')
-        pos_map[et["id"]] = et.get("singular_name") or et.get("singular_name_short")
-    return pos_map
-
-
-def build_team_map(bootstrap: dict) -> dict:
-    """Return a mapping team_id -> dict with id, name, short_name, code"""
-    tm = {}
-    for t in bootstrap.get("teams", []):
-        tm[t["id"]] = {
+        # missing, stale or unreadable cache; rebuild below
+        pass
+
+    full = load_bootstrap(path)
+    boot = {key: full[key] for key in _BOOTSTRAP_SECTIONS if key in full}
+    del full
+    data = BootstrapData(boot, *build_lookup_maps(boot))
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            # store a plain tuple so the cache doesn't depend on how the module was imported
+            pickle.dump(tuple(data), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # caching is best-effort
+        pass
+    return data
+
+
+# element fields copied into the `scoring_stats` section of the player JSON
+_SCORING_KEYS = (
+    'minutes',
+    'goals_scored',
+    'assists',
+    'clean_sheets',
+    'goals_conceded',
+    'own_goals',
+    'penalties_saved',
+    'penalties_missed',
+    'yellow_cards',
+    'red_cards',
+    'saves',
+    'bonus',
+    'bps',
+    'influence',
+    'creativity',
+    'threat',
+    'ict_index',
+    'expected_goals',
+    'expected_assists',
+    'expected_goal_involvements',
+    'expected_goals_conceded',
+    'points_per_game',
+    'event_points',
+    'ep_this',
+    'ep_next',
+)
+
+
+def build_lookup_maps(bootstrap: dict) -> tuple:
+    """Return (pos_map, team_map, name_index) for a bootstrap in one call.
+
+    - pos_map: element_type id -> readable position (e.g. 'Goalkeeper')
+    - team_map: team id -> dict with id, name, short_name, code
+    - name_index: see build_name_index
+    """
+    # prefer singular_name (e.g. 'Goalkeeper')
+    pos_map = {
+        et["id"]: et.get("singular_name") or et.get("singular_name_short")
+        for et in bootstrap.get("element_types", [])
+    }
+    team_map = {
+        t["id"]: {
             "id": t.get("id"),
             "name": t.get("name"),
             "short_name": t.get("short_name"),
             "code": t.get("code"),
         }
-    return tm
+        for t in bootstrap.get("teams", [])
+    }
+    return pos_map, team_map, build_name_index(bootstrap)
+
+
+def _norm(s: str) -> str:
+    """Lowercase s and strip diacritics, keeping spaces (the name-index key form)."""
+    if not s.isascii():
+        s = unicodedata.normalize("NFKD", s)
+        combining = unicodedata.combining
+        s = "".join([ch for ch in s if not combining(ch)])
+    return s.lower().strip()
+
+
+def _trigrams(s: str) -> set:
+    return {s[i:i + 3] for i in range(len(s) - 2)}
 
 
-def find_players(bootstrap: dict, query: str) -> list:
+def build_name_index(bootstrap: dict) -> dict:
+    """Return the lookup structures used by find_players.
+
+    - `exact`: normalized candidate name (web_name, full name, first or second
+      name; lowercased with diacritics stripped) -> list of element ids
+    - `trigrams`: 3-character window -> set of candidate names containing it
+    - `id_to_el`: element id -> element dict
+    - `fuzzy`: memo of normalized query -> closest name (or None), filled by
+      find_players as it falls back to fuzzy matching
+    """
+    exact = {}
+    id_to_el = {}
+    # bind the method once; this loop runs for every element
+    exact_setdefault = exact.setdefault
+    for el in bootstrap.get("elements", []):
+        pid = el["id"]
+        id_to_el[pid] = el
+        # normalize each name part once and reuse it for the full name
+        web = _norm(el.get("web_name") or "")
+        first = _norm(el.get("first_name") or "")
+        alt = _norm(el.get("second_name") or "")
+        full = f"{first} {alt}".strip()
+        # register each distinct, non-empty variant once per element
+        if web:
+            exact_setdefault(web, []).append(pid)
+        if full and full != web:
+            exact_setdefault(full, []).append(pid)
+        if alt and alt != web and alt != full:
+            exact_setdefault(alt, []).append(pid)
+        if first and first != web and first != full and first != alt:
+            exact_setdefault(first, []).append(pid)
+
+    trigrams = {}
+    for key in exact:
+        for tri in _trigrams(key):
+            trigrams.setdefault(tri, set()).add(key)
+    return {"exact": exact, "trigrams": trigrams, "id_to_el": id_to_el, "fuzzy": {}}
+
+
+def _closest_name(query: str, candidates: tuple):
+    """Return the candidate name closest to query, or None if nothing is close."""
+    if process:
+        hit = process.extractOne(query, candidates, scorer=fuzz.ratio, score_cutoff=60)
+        return hit[0] if hit else None
+    close = get_close_matches(query, candidates, n=1, cutoff=0.6)
+    return close[0] if close else None
+
+
+def find_players(bootstrap: dict, query: str, name_index: dict = None) -> list:
     """Return a list of element dicts matching the query.
 
+    Names and query are compared lowercased with diacritics stripped.
+
     Matching strategy (descending priority):
       - exact match against web_name, full name, first or second name
       - substring matches (any candidate containing query)
-      - fuzzy closest match (1-best)
+      - fuzzy closest match (1-best) among names sharing a trigram with the query
 
+    Pass a prebuilt `name_index` (see build_name_index) to avoid rebuilding it.
     Returns an empty list when nothing matches.
     """
-    q = query.strip().lower()
-    elements = bootstrap.get("elements", [])
-
-    # prepare a mapping from candidate name -> list of elements
-    name_to_elems = {}
-    candidates = []
-    for el in elements:
-        web = (el.get("web_name") or "").strip()
-        full = ((el.get("first_name") or "") + " " + (el.get("second_name") or "")).strip()
-        alt = (el.get("second_name") or "").strip()
-        first = (el.get("first_name") or "").strip()
-        for nm in {web, full, alt, first}:
-            if not nm:
-                continue
-            key = nm.lower()
-            name_to_elems.setdefault(key, []).append(el)
-            candidates.append(key)
+    q = _norm(query)
+    if name_index is None:
+        name_index = build_name_index(bootstrap)
+    exact = name_index["exact"]
+    trigrams = name_index["trigrams"]
+    id_to_el = name_index["id_to_el"]
 
     # 1) exact match
-    if q in name_to_elems:
-        # return a copy to avoid external mutation
-        return list({el['id']: el for el in name_to_elems[q]}.values())
-
-    # 2) substring matches (contains) - collect all distinct elements
-    substring_keys = [name for name in candidates if q in name]
+    if q in exact:
+        return [id_to_el[pid] for pid in exact[q]]
+
+    # 2) substring matches (contains) - only names holding every trigram of the
+    # query can contain it; queries shorter than a trigram check every name
+    if len(q) >= 3:
+        postings = sorted((trigrams.get(tri, set()) for tri in _trigrams(q)), key=len)
+        keys = set.intersection(*postings)
+    else:
+        keys = exact
+    substring_keys = [name for name in keys if q in name]
     if substring_keys:
-        seen = {}
-        for key in substring_keys:
-            for el in name_to_elems.get(key, []):
-                seen[el['id']] = el
-        return list(seen.values())
-
-    # 3) fuzzy closest match (single key)
-    close = get_close_matches(q, candidates, n=1, cutoff=0.6)
-    if close:
-        return list({el['id']: el for el in name_to_elems[close[0]]}.values())
+        ids = {pid for key in substring_keys for pid in exact[key]}
+        return [id_to_el[pid] for pid in sorted(ids)]
+
+    # 3) fuzzy closest match (single key), memoized on the index by query
+    fuzzy = name_index["fuzzy"]
+    if q in fuzzy:
+        best = fuzzy[q]
+    else:
+        if len(q) >= 3:
+            candidates = tuple(sorted(set().union(*(trigrams.get(tri, ()) for tri in _trigrams(q)))))
+        else:
+            candidates = ()
+        best = fuzzy[q] = _closest_name(q, candidates or tuple(exact))
+    if best:
+        return [id_to_el[pid] for pid in exact[best]]
 
     return []
 
 
-def _extract_gameweek_stats(history: List[dict], fixtures_map: Dict[int, dict] = None) -> List[dict]:
-    """Convert element-summary history entries into simplified per-gameweek stats.
-
-    Each returned item contains:
-      - event (round/gameweek id when available)
-      - goals (goals_scored)
-      - assists
-      - yellow_cards
-      - red_cards
-      - goals_conceded
-      - total_score (per-gameweek points; tries several common field names)
-    """
-    out = []
-    fixtures_map = fixtures_map or {}
-    for h in history or []:
-        ev = h.get("round") or h.get("event") or (fixtures_map.get(h.get("fixture"), {}) if h.get("fixture") else {}) and None
-        # if fixture map contains event, prefer it
-        if h.get("fixture") and fixtures_map and h.get("fixture") in fixtures_map:
-            ev = fixtures_map[h.get("fixture")].get("event")
-
-        total_score = h.get("total_points") or h.get("event_points") or h.get("points") or h.get("total") or 0
-
-        item = {
-            "event": ev,
-            "goals": h.get("goals_scored") or 0,
-            "assists": h.get("assists") or 0,
-            "yellow_cards": h.get("yellow_cards") or 0,
-            "red_cards": h.get("red_cards") or 0,
-            "goals_conceded": h.get("goals_conceded") or 0,
-            "total_score": total_score,
-        }
-        out.append(item)
-    return out
-
-
 @click.command()
 @click.option('--player', required=True, help='Player name (web name or full name)')
 @click.option('--bootstrap', 'bootstrap_path', default='bootstrap-static.json', show_default=True,
@@ -187,29 +267,34 @@ def _extract_gameweek_stats(history: List[dict], fixtures_map: Dict[int, dict] =
               help='Directory to write player JSON files to')
 @click.option('--write-all', '-a', is_flag=True, default=False,
               help='When multiple players match, write all without prompting')
-def cli(player: str, bootstrap_path: str, output_dir: str, write_all: bool):
-    """Extract player info from BOOTSTRAP and write a JSON file into OUTPUT_DIR."""
+@click.option('--jsonl-output', 'jsonl_output', default=None,
+              type=click.Path(file_okay=True, dir_okay=False, writable=True),
+              help='Write all selected players as JSON lines to this file instead of one file each')
+def cli(player: str, bootstrap_path: str, output_dir: str, write_all: bool, jsonl_output: str):
+    """Extract player info from BOOTSTRAP and write a JSON file into OUTPUT_DIR.
+
+    With --jsonl-output, all selected players go to a single JSON-lines file
+    instead (one record per player, including its element id).
+    """
 
     if not os.path.exists(bootstrap_path):
         click.echo(f"bootstrap file not found: {bootstrap_path}", err=True)
         raise SystemExit(2)
 
     try:
-        boot = load_bootstrap(bootstrap_path)
+        boot, pos_map, team_map, name_index = load_bootstrap_cached(bootstrap_path)
     except Exception as e:
         click.echo(f"Failed to load bootstrap file: {e}", err=True)
         raise SystemExit(3)
 
-    pos_map = build_position_map(boot)
-    team_map = build_team_map(boot)
-
-    matches = find_players(boot, player)
+    matches = find_players(boot, player, name_index)
     if not matches:
         click.echo(f"Player not found for query: '{player}'", err=True)
         raise SystemExit(1)
 
     # ensure output dir exists
-    os.makedirs(output_dir, exist_ok=True)
+    if not jsonl_output:
+        os.makedirs(output_dir, exist_ok=True)
 
     # If multiple matches and user didn't pass --write-all, offer interactive disambiguation
     selected = list(range(len(matches)))
@@ -245,6 +330,7 @@ def cli(player: str, bootstrap_path: str, output_dir: str, write_all: bool):
                 raise SystemExit(1)
 
     written = []
+    records = []
     for i, el in enumerate(matches, start=1):
         if (i - 1) not in selected:
             continue
@@ -258,33 +344,7 @@ def cli(player: str, bootstrap_path: str, output_dir: str, write_all: bool):
 
         total_points = el.get('total_points')
 
-        scoring_stats = {
-            'minutes': el.get('minutes'),
-            'goals_scored': el.get('goals_scored'),
-            'assists': el.get('assists'),
-            'clean_sheets': el.get('clean_sheets'),
-            'goals_conceded': el.get('goals_conceded'),
-            'own_goals': el.get('own_goals'),
-            'penalties_saved': el.get('penalties_saved'),
-            'penalties_missed': el.get('penalties_missed'),
-            'yellow_cards': el.get('yellow_cards'),
-            'red_cards': el.get('red_cards'),
-            'saves': el.get('saves'),
-            'bonus': el.get('bonus'),
-            'bps': el.get('bps'),
-            'influence': el.get('influence'),
-            'creativity': el.get('creativity'),
-            'threat': el.get('threat'),
-            'ict_index': el.get('ict_index'),
-            'expected_goals': el.get('expected_goals'),
-            'expected_assists': el.get('expected_assists'),
-            'expected_goal_involvements': el.get('expected_goal_involvements'),
-            'expected_goals_conceded': el.get('expected_goals_conceded'),
-            'points_per_game': el.get('points_per_game'),
-            'event_points': el.get('event_points'),
-            'ep_this': el.get('ep_this'),
-            'ep_next': el.get('ep_next'),
-        }
+        scoring_stats = {k: el.get(k) for k in _SCORING_KEYS}
 
         # include team metadata (id + human name) instead of numeric id only
         team_info = team_map.get(el.get('team'))
@@ -305,14 +365,24 @@ def cli(player: str, bootstrap_path: str, output_dir: str, write_all: bool):
             'now_cost_raw': now_cost_raw,
         }
 
+        if jsonl_output:
+            records.append({'id': el.get('id'), **out})
+            continue
+
         # if multiple matches, append the element id to the filename for uniqueness
         base = sanitize_filename(full_name or el.get('web_name') or player)
         filename = f"{base}.json" if len(matches) == 1 else f"{base}_{el.get('id')}.json"
         out_path = os.path.join(output_dir, filename)
-        with open(out_path, 'w', encoding='utf-8') as f:
-            json.dump(out, f, ensure_ascii=False, indent=2)
+        write_json(out_path, out)
         written.append(out_path)
 
+    if jsonl_output:
+        # one open/write/close for the whole batch
+        with open(jsonl_output, 'wb') as f:
+            f.write(b''.join(dumps_line(r) for r in records))
+        click.echo(f"Wrote {len(records)} player record(s) to {jsonl_output}")
+        return
+
     click.echo(f"Wrote {len(written)} player file(s):")
     for p in written:
         click.echo(f"  {p}")
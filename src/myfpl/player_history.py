@@ -14,57 +14,39 @@ Notes / limitations:
   each scoring event.
 """
 import csv
-import json
 import os
-import sys
-import time
-import urllib.request
-import urllib.error
-from datetime import datetime
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List
 
 import click
 
-from myfpl.player_data import load_bootstrap, find_players, sanitize_filename
+from myfpl.api import SUMMARY_CACHE_DIR, fetch_summary
+from myfpl.jsonio import write_json
+from myfpl.player_data import load_bootstrap_cached, find_players, sanitize_filename
 from myfpl.fixtures import get_fixtures_map
 
+# concurrent element-summary requests; matches the shared session's pool size
+FETCH_WORKERS = 8
 
-FPL_BASE = "https://fantasy.premierleague.com/api"
 
+def save_json(obj: Dict, path: str) -> None:
+    write_json(path, obj)
 
-def fetch_json(url: str, retries: int = 2, backoff: float = 0.3) -> Dict:
-    req = urllib.request.Request(url, headers={"User-Agent": "myfpl-fetcher/1.0"})
-    for attempt in range(retries + 1):
-        try:
-            with urllib.request.urlopen(req, timeout=20) as r:
-                return json.load(r)
-        except urllib.error.HTTPError as e:
-            # 404 or 5xx - no point retrying some errors
-            if 400 <= e.code < 500:
-                raise
-            if attempt < retries:
-                time.sleep(backoff * (attempt + 1))
-                continue
-            raise
-        except Exception:
-            if attempt < retries:
-                time.sleep(backoff * (attempt + 1))
-                continue
-            raise
 
+# columns added to every history row, written first in the CSVs
+_EXTRA_COLUMNS = ["player_id", "player_name", "fixture_event", "fixture_kickoff_time"]
 
-def save_json(obj: Dict, path: str) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
 
+def _csv_columns(keys) -> List[str]:
+    return _EXTRA_COLUMNS + sorted(k for k in keys if k not in _EXTRA_COLUMNS)
 
-def parse_kickoff(iso: str) -> str:
-    try:
-        # keep original timezone info if present
-        dt = datetime.fromisoformat(iso.replace("Z", "+00:00"))
-        return dt.isoformat()
-    except Exception:
-        return iso
+
+def _write_csv(path: str, out_keys: List[str], rows: List[Dict]) -> None:
+    with open(path, "w", newline='', encoding="utf-8", buffering=1 << 20) as csvf:
+        w = csv.writer(csvf)
+        w.writerow(out_keys)
+        w.writerows([r.get(k) for k in out_keys] for r in rows)
 
 
 @click.command()
@@ -76,7 +58,10 @@ def parse_kickoff(iso: str) -> str:
               help="Directory to write outputs to")
 @click.option("--no-fetch", is_flag=True, default=False,
               help="Do not fetch data from the network; only use local bootstrap data")
-def cli(player: str, bootstrap_path: str, output_dir: str, no_fetch: bool):
+@click.option("--cache-dir", "cache_dir", default=SUMMARY_CACHE_DIR, show_default=True,
+              type=click.Path(file_okay=False, dir_okay=True),
+              help="Directory used to cache element-summary responses between runs")
+def cli(player: str, bootstrap_path: str, output_dir: str, no_fetch: bool, cache_dir: str):
     """Fetch per-gameweek histories for PLAYER and write JSON + CSV into OUTPUT_DIR."""
 
     if not os.path.exists(bootstrap_path):
@@ -84,12 +69,12 @@ def cli(player: str, bootstrap_path: str, output_dir: str, no_fetch: bool):
         raise SystemExit(2)
 
     try:
-        boot = load_bootstrap(bootstrap_path)
+        data = load_bootstrap_cached(bootstrap_path)
     except Exception as e:
         click.echo(f"Failed to load bootstrap file: {e}", err=True)
         raise SystemExit(3)
 
-    matches = find_players(boot, player)
+    matches = find_players(data.boot, player, data.name_index)
     if not matches:
         click.echo(f"Player not found for query: '{player}'", err=True)
         raise SystemExit(1)
@@ -107,70 +92,89 @@ def cli(player: str, bootstrap_path: str, output_dir: str, no_fetch: bool):
             click.echo("Failed to fetch fixtures; continuing without fixture mapping")
 
     combined_rows: List[Dict] = []
+    rows_by_pid: Dict[int, List[Dict]] = defaultdict(list)
+    # history rows from the API share one schema, so the CSV columns are
+    # normally computed once and reused; a row with other keys widens the set
+    schema_keys: set = set()
+    out_keys: List[str] = []
+    all_keys: set = set()
+
+    def player_name(el: Dict) -> str:
+        return ((el.get("first_name") or "") + " " + (el.get("second_name") or "")).strip() or el.get("web_name")
+
+    # fetch all element-summaries up front so the network round-trips overlap
+    summaries: Dict[int, Dict] = {}
+    if no_fetch:
+        for el in matches:
+            click.echo(f"Skipping element-summary fetch for {player_name(el)} (id={el.get('id')})")
+    else:
+        pids = [el.get("id") for el in matches]
+        for el in matches:
+            click.echo(f"Fetching element-summary for {player_name(el)} (id={el.get('id')})...")
+        with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(pids))) as ex:
+            results = ex.map(lambda p: fetch_summary(p, cache_dir), pids)
+            # a failed player is reported and skipped; the others are kept
+            for pid, (summary, error) in zip(pids, results):
+                if error is not None:
+                    click.echo(f"Warning: failed to fetch element-summary for id={pid}: {error}", err=True)
+                else:
+                    summaries[pid] = summary
+            saves = [
+                ex.submit(save_json, summary, os.path.join(output_dir, f"element_{pid}_summary.json"))
+                for pid, summary in summaries.items()
+            ]
+            for fut in saves:
+                fut.result()
 
     for el in matches:
         pid = el.get("id")
-        pname = ((el.get("first_name") or "") + " " + (el.get("second_name") or "")).strip() or el.get("web_name")
+        pname = player_name(el)
         filename_base = sanitize_filename(pname or f"player_{pid}")
-
-        if not no_fetch:
-            click.echo(f"Fetching element-summary for {pname} (id={pid})...")
-            summary = fetch_json(f"{FPL_BASE}/element-summary/{pid}/")
-            player_json_path = os.path.join(output_dir, f"element_{pid}_summary.json")
-            save_json(summary, player_json_path)
-        else:
-            click.echo(f"Skipping element-summary fetch for {pname} (id={pid})")
-            summary = {"history": []}
+        summary = summaries.get(pid) or {"history": []}
 
         # history entries are per-match / per-gameweek. We'll merge available fields
         history = summary.get("history", []) or []
+        keys = set(history[0]) if history else set()
         for h in history:
-            # attach player metadata
-            row = dict(h)  # shallow copy
-            row.setdefault("player_id", pid)
-            row.setdefault("player_name", pname)
+            if h.keys() != keys:
+                keys.update(h)
+            # attach player metadata; the summary is not reused, so extend
+            # the row in place instead of copying it
+            h.setdefault("player_id", pid)
+            h.setdefault("player_name", pname)
 
             # map fixture -> kickoff_time + event id when available
             fx_id = h.get("fixture")
-            if fx_id and fx_id in fixtures_map:
-                fx = fixtures_map[fx_id]
-                row["fixture_event"] = fx.get("event")
-                row["fixture_kickoff_time"] = fx.get("kickoff_time")
+            fx = fixtures_map.get(fx_id) if fx_id else None
+            if fx is not None:
+                h["fixture_event"] = fx.get("event")
+                h["fixture_kickoff_time"] = fx.get("kickoff_time")
             else:
                 # element-summary may contain a 'round' or 'event' field already
-                row["fixture_event"] = h.get("round") or h.get("event") or h.get("round_id")
-                row["fixture_kickoff_time"] = None
+                h["fixture_event"] = h.get("round") or h.get("event") or h.get("round_id")
+                h["fixture_kickoff_time"] = None
 
-            combined_rows.append(row)
+            combined_rows.append(h)
+            rows_by_pid[pid].append(h)
 
         # write per-player CSV as well
         if history:
-            keys = sorted({k for d in history for k in d.keys()})
-            # include our extra columns
-            extra = ["player_id", "player_name", "fixture_event", "fixture_kickoff_time"]
-            out_keys = extra + [k for k in keys if k not in extra]
+            if keys != schema_keys:
+                schema_keys = keys
+                out_keys = _csv_columns(keys)
+            all_keys |= keys
             csv_path = os.path.join(output_dir, f"{filename_base}_{pid}_history.csv")
-            with open(csv_path, "w", newline='', encoding="utf-8") as csvf:
-                w = csv.DictWriter(csvf, fieldnames=out_keys, extrasaction="ignore")
-                w.writeheader()
-                for r in combined_rows:
-                    if r.get("player_id") == pid:
-                        w.writerow({k: r.get(k) for k in out_keys})
+            _write_csv(csv_path, out_keys, rows_by_pid[pid])
             click.echo(f"Wrote history CSV for {pname} -> {csv_path}")
         else:
             click.echo(f"No per-gameweek history available for {pname} (id={pid})")
 
     # write combined CSV for all players
     if combined_rows:
-        keys = sorted({k for d in combined_rows for k in d.keys()})
-        extra = ["player_id", "player_name", "fixture_event", "fixture_kickoff_time"]
-        out_keys = extra + [k for k in keys if k not in extra]
+        if all_keys != schema_keys:
+            out_keys = _csv_columns(all_keys)
         combined_path = os.path.join(output_dir, "players_history_combined.csv")
-        with open(combined_path, "w", newline='', encoding="utf-8") as csvf:
-            w = csv.DictWriter(csvf, fieldnames=out_keys, extrasaction="ignore")
-            w.writeheader()
-            for r in combined_rows:
-                w.writerow({k: r.get(k) for k in out_keys})
+        _write_csv(combined_path, out_keys, combined_rows)
         click.echo(f"Wrote combined history CSV -> {combined_path}")
     else:
         click.echo("No per-gameweek rows collected; combined CSV not written.")
@@ -5,27 +5,26 @@ Usage examples:
   pixi run python3 teams_list.py --bootstrap bootstrap-static.json --format json --output teams.json
   pixi run python3 teams_list.py --format csv > teams.csv
 """
+import csv
+import io
 import json
 import os
 from typing import List, Dict
 import click
 
-
-def load_bootstrap(path: str) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+from myfpl.jsonio import load_bootstrap
 
 
 def extract_teams(bootstrap: dict) -> List[Dict]:
-    teams = []
-    for t in bootstrap.get("teams", []):
-        teams.append({
+    return [
+        {
             "id": t.get("id"),
             "name": t.get("name"),
             "short_name": t.get("short_name"),
             "code": t.get("code"),
-        })
-    return teams
+        }
+        for t in bootstrap.get("teams", [])
+    ]
 
 
 @click.command()
@@ -39,30 +38,34 @@ def cli(bootstrap_path: str, out_format: str, output_path: str):
         click.echo(f"bootstrap file not found: {bootstrap_path}", err=True)
         raise SystemExit(2)
 
-    boot = load_bootstrap(bootstrap_path)
-    teams = extract_teams(boot)
+    # only the ~20 team records are kept; the rest of the parse is dropped here
+    teams = extract_teams(load_bootstrap(bootstrap_path))
 
+    # every format builds newline-terminated text, written out in one call
     if out_format == "json":
-        text = json.dumps(teams, ensure_ascii=False, indent=2)
+        text = json.dumps(teams, ensure_ascii=False, indent=2) + "\n"
     elif out_format == "pretty":
-        lines = [f"{t['id']:>3}  {t['short_name'] or '' :<6}  {t['name']}" for t in teams]
-        text = "\n".join(lines)
-    else:  # csv
-        rows = ["id,short_name,name"]
+        # short names pad to at least 6 columns, wider if a team needs it
+        width = max(6, max((len(t["short_name"] or "") for t in teams), default=0))
+        row = f"{{:>3}}  {{:<{width}}}  {{}}\n".format
+        buf = io.StringIO()
         for t in teams:
-            # escape commas in name
-            name = (t['name'] or '').replace('"', '""')
-            short = (t['short_name'] or '').replace('"', '""')
-            rows.append(f'{t["id"]},"{short}","{name}"')
-        text = "\n".join(rows)
+            buf.write(row(t["id"], t["short_name"] or "", t["name"]))
+        text = buf.getvalue()
+    else:  # csv
+        buf = io.StringIO()
+        buf.write("id,short_name,name\n")
+        # QUOTE_NONNUMERIC keeps the numeric id bare and quotes the names
+        w = csv.writer(buf, quoting=csv.QUOTE_NONNUMERIC, lineterminator="\n")
+        w.writerows((t["id"], t["short_name"] or "", t["name"] or "") for t in teams)
+        text = buf.getvalue()
 
     if output_path:
         with open(output_path, "w", encoding="utf-8") as fh:
             fh.write(text)
         click.echo(f"Wrote teams to: {output_path}")
     else:
-        click.echo(text)
-
+        click.echo(text, nl=False)
 
 if __name__ == "__main__":
     cli()
@@ -1,10 +1,19 @@
 import argparse
-import json
+import hashlib
+import os
+import pickle
 import sys
 import unicodedata
 import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass, fields
+from difflib import get_close_matches
+from functools import lru_cache
+from operator import attrgetter
 from pathlib import Path
 
+from myfpl.jsonio import load_bootstrap
+
 try:
     import yaml
 except Exception:
@@ -14,19 +23,110 @@ except Exception:
     )
     sys.exit(2)
 
+# C-accelerated safe dumper when PyYAML was built against libyaml
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+try:
+    import simdjson
+except ImportError:  # optional speedup; load the bootstrap with load_bootstrap
+    simdjson = None
+
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:  # optional speedup; fall back to difflib
+    process = None
+
+# minimum similarity (0-100) and number of names for the fuzzy fallback
+FUZZY_CUTOFF = 88
+FUZZY_LIMIT = 5
+
+
+_WS_RE = re.compile(r"\s+")
+_EMPTY_TEAM = {"name": "", "short_name": "", "code": ""}
+
+
+class _NormTable(dict):
+    """str.translate table dropping combining marks and mapping '.'/'-' to spaces.
+
+    Code points are classified lazily on first sight and memoized, so the
+    table only ever holds characters that actually occur in names.
+    """
+
+    def __missing__(self, cp: int):
+        value = None if unicodedata.combining(chr(cp)) else cp
+        self[cp] = value
+        return value
 
+
+_NORM_TABLE = _NormTable({ord("."): " ", ord("-"): " "})
+_ACCENT_TABLE = _NormTable()
+_NON_SLUG_RE = re.compile(r"[^a-z0-9_]")
+
+
+@lru_cache(maxsize=8192)
 def normalize(s: str) -> str:
     if s is None:
         return ""
     s = str(s)
-    s = unicodedata.normalize("NFKD", s)
-    s = "".join(ch for ch in s if not unicodedata.combining(ch))
-    s = s.replace(".", " ").replace("-", " ").lower()
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+    # ASCII has nothing to decompose; most player and team names take this path
+    if s.isascii():
+        # str.replace has dedicated fast paths; a dict-driven translate is
+        # several times slower on short ASCII strings
+        s = s.replace(".", " ").replace("-", " ").lower()
+    else:
+        s = unicodedata.normalize("NFKD", s).translate(_NORM_TABLE).lower()
+    return _WS_RE.sub(" ", s).strip()
+
+
+@lru_cache(maxsize=1024)
+def norm_full_name(first_name: str, second_name: str) -> str:
+    """Return the slug used for player file names, e.g. "david_raya_martin"."""
+    s = f"{first_name} {second_name}".strip()
+    if not s.isascii():
+        s = unicodedata.normalize("NFKD", s).translate(_ACCENT_TABLE)
+    s = s.lower()
+    s = _WS_RE.sub("_", s)
+    return _NON_SLUG_RE.sub("", s)
+
+
+@dataclass(slots=True)
+class Player:
+    """One bootstrap element with the fields validate uses.
+
+    Supports `p["id"]` and `p.get("id")` as well, so code written against
+    the earlier dict records keeps working.
+    """
+
+    id: int | None
+    web_name: str | None
+    first_name: str
+    second_name: str
+    now_cost: int | None  # integer (usually tenths)
+    position: str
+    team_id: int | None
+    team_name: str
+    team_short: str
+    team_code: int | str
+    norm_web: str
+    norm_full: str
+    norm_second: str
+    norm_first_initial: str
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
 
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
 
-def build_players_index(bootstrap: dict) -> list[dict]:
+
+# Player -> tuple of its field values, in constructor order
+_player_row = attrgetter(*(f.name for f in fields(Player)))
+
+
+def build_players_index(bootstrap: dict) -> list[Player]:
     # element_types: id -> short name (GK/DEF/MID/FWD)
     et_map = {
         et["id"]: et.get("singular_name_short", "")
@@ -43,91 +143,217 @@ def build_players_index(bootstrap: dict) -> list[dict]:
     }
     players = []
     for el in bootstrap.get("elements", []):
-        p = {
-            "id": el.get("id"),
-            "web_name": el.get("web_name"),
-            "first_name": el.get("first_name") or "",
-            "second_name": el.get("second_name") or "",
-            "now_cost": el.get("now_cost"),  # integer (usually tenths)
-            "position": et_map.get(el.get("element_type"), ""),
-            "team_id": el.get("team"),
-            "team_name": team_map.get(el.get("team"), {}).get("name", ""),
-            "team_short": team_map.get(el.get("team"), {}).get("short_name", ""),
-            "team_code": team_map.get(el.get("team"), {}).get("code", ""),
-        }
-        p["norm_web"] = normalize(p["web_name"])
-        p["norm_full"] = normalize(f"{p['first_name']} {p['second_name']}".strip())
-        p["norm_second"] = normalize(p["second_name"])
-        players.append(p)
+        team = team_map.get(el.get("team")) or _EMPTY_TEAM
+        web_name = el.get("web_name")
+        first_name = el.get("first_name") or ""
+        second_name = el.get("second_name") or ""
+        # interned so players sharing a name share one string object, and
+        # index lookups with an interned query can match by identity
+        norm_second = sys.intern(normalize(second_name))
+        players.append(
+            Player(
+                id=el.get("id"),
+                web_name=web_name,
+                first_name=first_name,
+                second_name=second_name,
+                now_cost=el.get("now_cost"),
+                position=et_map.get(el.get("element_type"), ""),
+                team_id=el.get("team"),
+                team_name=team["name"],
+                team_short=team["short_name"],
+                team_code=team["code"],
+                norm_web=sys.intern(normalize(web_name)),
+                # normalize works per character and collapses whitespace, so the
+                # full name can be joined from the (usually cached) normalized parts
+                norm_full=sys.intern(f"{normalize(first_name)} {norm_second}".strip()),
+                norm_second=norm_second,
+                norm_first_initial=sys.intern(normalize(first_name[:1])),
+            )
+        )
     return players
 
 
-def match_candidate(candidate: str, players: list[dict]) -> list[dict]:
-    # candidate: a name like "Harry Kane" or "H. Kane". Optional team hint handled by caller
+def build_name_indexes(players: list[Player]) -> dict:
+    """Build hash indexes over the normalized names of `players`.
+
+    Name indexes map a normalized key to the positions of matching players in
+    `players`; `by_team` maps a normalized team name/short name/code to the
+    set of team ids it refers to.
+    """
+    by_web = defaultdict(list)
+    by_full = defaultdict(list)
+    by_second = defaultdict(list)
+    by_initial_last = defaultdict(list)
+    by_team = defaultdict(set)
+    for i, p in enumerate(players):
+        by_web[p.norm_web].append(i)
+        by_full[p.norm_full].append(i)
+        by_second[p.norm_second].append(i)
+        by_initial_last[(p.norm_first_initial, p.norm_second)].append(i)
+        for key in (p.team_name, p.team_short, p.team_code):
+            key = normalize(key)
+            if key:
+                by_team[key].add(p.team_id)
+    return {
+        "by_web": dict(by_web),
+        "by_full": dict(by_full),
+        "by_second": dict(by_second),
+        "by_initial_last": dict(by_initial_last),
+        "by_team": dict(by_team),
+    }
+
+
+def _close_full_names(n: str, full_names: tuple) -> list[str]:
+    """Return up to FUZZY_LIMIT of full_names scoring at least FUZZY_CUTOFF against n."""
+    if process is not None:
+        # fuzz.ratio scores like difflib's SequenceMatcher.ratio, so both
+        # paths accept the same names; WRatio's partial matching would score
+        # short queries like "son" highly against any name containing them
+        return [
+            name
+            for name, _, _ in process.extract(
+                n,
+                full_names,
+                scorer=fuzz.ratio,
+                score_cutoff=FUZZY_CUTOFF,
+                limit=FUZZY_LIMIT,
+            )
+        ]
+    return get_close_matches(n, full_names, n=FUZZY_LIMIT, cutoff=FUZZY_CUTOFF / 100)
+
+
+def _exact_hits(n: str, indexes: dict) -> set[int]:
+    """Return the player positions whose names match the normalized n exactly."""
+    hits = set(indexes["by_web"].get(n, ()))
+    hits.update(indexes["by_full"].get(n, ()))
+    hits.update(indexes["by_second"].get(n, ()))
+    if len(hits) == 1:
+        # a unique exact name hit wins over the initial-form guess below
+        return hits
+    # match initial forms like "M. Salah" or "M Salah" (normalize drops the dot)
+    parts = n.split()
+    if len(parts) >= 2 and len(parts[0]) == 1:
+        hits.update(indexes["by_initial_last"].get((parts[0], " ".join(parts[1:])), ()))
+    return hits
+
+
+def is_fuzzy_match(candidate: str, indexes: dict) -> bool:
+    """True when match_candidate can only resolve candidate via the fuzzy fallback."""
     n = normalize(candidate)
-    matches = []
-    for p in players:
-        if n == p["norm_web"] or n == p["norm_full"] or n == p["norm_second"]:
-            matches.append(p)
-            continue
-        # match initial forms like "M. Salah" or "M Salah"
-        parts = n.split()
-        if len(parts) >= 2:
-            first, last = parts[0], " ".join(parts[1:])
-            # initial check: single letter initial
-            if len(first) == 1:
-                if first == normalize(p["first_name"][:1]) and last == p["norm_second"]:
-                    matches.append(p)
-                    continue
-            # leading initial with dot removed handled by normalize already
-            if (
-                len(first) == 2
-                and first.endswith(".")
-                and first[0] == normalize(p["first_name"][:1])
-            ):
-                if last == p["norm_second"]:
-                    matches.append(p)
-                    continue
-        # try last name only if unique
-        if n == p["norm_second"]:
-            matches.append(p)
-    return matches
+    return bool(n) and not _exact_hits(n, indexes)
+
+
+def match_candidate(
+    candidate: str, players: list[Player], indexes: dict | None = None
+) -> list[Player]:
+    # candidate: a name like "Harry Kane" or "H. Kane". Optional team hint handled by caller
+    if indexes is None:
+        indexes = build_name_indexes(players)
+    n = sys.intern(normalize(candidate))
+    hits = _exact_hits(n, indexes)
+    if not hits and n:
+        # no exact hit: fall back to close full names, e.g. typos
+        by_full = indexes["by_full"]
+        for name in _close_full_names(n, tuple(by_full)):
+            hits.update(by_full[name])
+    # keep bootstrap order
+    return [players[i] for i in sorted(hits)]
 
 
 def match_candidate_with_team(
-    candidate: str, team_hint: str | None, players: list[dict]
-) -> list[dict]:
+    candidate: str,
+    team_hint: str | None,
+    players: list[Player],
+    indexes: dict | None = None,
+) -> list[Player]:
     """
     Match a candidate name, and optionally use a team_hint to filter ambiguous matches.
     The team_hint is normalized and compared against player's team_name, team_short, and team_code.
     """
-    matches = match_candidate(candidate, players)
+    if indexes is None:
+        indexes = build_name_indexes(players)
+    matches = match_candidate(candidate, players, indexes)
     if team_hint and matches:
-        th = normalize(team_hint)
-        filtered = []
-        for p in matches:
-            # compare team fields
-            if th == normalize(p.get("team_name", "")):
-                filtered.append(p)
-                continue
-            if th == normalize(p.get("team_short", "")):
-                filtered.append(p)
-                continue
-            if th == normalize(p.get("team_code", "")):
-                filtered.append(p)
-                continue
-        # If filtered non-empty, use it
-        if filtered:
-            return filtered
+        team_ids = indexes["by_team"].get(normalize(team_hint))
+        if team_ids:
+            filtered = [p for p in matches if p.team_id in team_ids]
+            # If filtered non-empty, use it
+            if filtered:
+                return filtered
     return matches
 
 
-def read_team_input(path: Path) -> list[str]:
-    # Expect a plain text file: one player name per line
-    with path.open("r", encoding="utf8") as fh:
-        # Keep raw lines for potential parsing of team hints
-        lines = [ln.rstrip() for ln in fh if ln.strip()]
-    return lines
+# bump when the layout of players/indexes changes
+_INDEX_CACHE_VERSION = 3
+
+# pickled indexes live in the user's cache dir, not next to the bootstrap
+INDEX_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "myfpl"
+
+
+def load_index_cached(bpath: Path) -> tuple[list[Player], dict]:
+    """Return (players, indexes) for the bootstrap at bpath.
+
+    The result is pickled to `INDEX_CACHE_DIR/players-<path hash>.pkl`, keyed
+    on the bootstrap's mtime and size, so repeated runs on an unchanged file
+    skip the JSON parse and the index building. Each bootstrap path has one
+    cache file, which is overwritten when the bootstrap changes.
+    """
+    st = bpath.stat()
+    key = (_INDEX_CACHE_VERSION, st.st_mtime_ns, st.st_size)
+    path_hash = hashlib.blake2b(str(bpath.resolve()).encode("utf-8"), digest_size=8).hexdigest()
+    cache_path = INDEX_CACHE_DIR / f"players-{path_hash}.pkl"
+    try:
+        with cache_path.open("rb") as fh:
+            if pickle.load(fh) == key:
+                rows, indexes = pickle.load(fh)
+                return [Player(*row) for row in rows], indexes
+    except Exception:
+        # missing, stale or unreadable cache; rebuild below
+        pass
+
+    if simdjson is not None:
+        # lazy document: only the fields build_players_index reads are turned
+        # into Python objects. A parser can't be reused while its document is
+        # alive, so each load gets its own.
+        bootstrap = simdjson.Parser().load(str(bpath))
+    else:
+        bootstrap = load_bootstrap(bpath)
+    # build_players_index copies only the element/team fields validate uses;
+    # release the full parse tree before building the name indexes
+    players = build_players_index(bootstrap)
+    del bootstrap
+    indexes = build_name_indexes(players)
+    # per-process temp name: parallel runs may rebuild the same cache
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        INDEX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with tmp_path.open("wb") as fh:
+            pickle.dump(key, fh, protocol=5)
+            # store plain field tuples: validate runs both as a script and as
+            # myfpl.validate, so a pickled Player class would not always resolve
+            rows = [_player_row(p) for p in players]
+            pickle.dump((rows, indexes), fh, protocol=5)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # caching is best-effort
+        pass
+    return players, indexes
+
+
+# one team-file line: "Player Name" or "Player Name; Team Name". [^\S\n] is
+# whitespace other than newline, so surrounding blanks are trimmed per line.
+_LINE_RE = re.compile(
+    r"^[^\S\n]*([^;\n]*?)[^\S\n]*(?:;[^\S\n]*(.*?))?[^\S\n]*$", re.M
+)
+
+
+def parse_team_input(text: str) -> list[tuple[str, str | None]]:
+    """Parse a whole team file into (player_name, team_hint_or_None) pairs.
+
+    Equivalent to parse_input_line over each non-blank line, in a single
+    regex pass.
+    """
+    return [(m[1], m[2] or None) for m in _LINE_RE.finditer(text) if m[0].strip()]
 
 
 def parse_input_line(line: str) -> tuple[str, str | None]:
@@ -144,7 +370,7 @@ def parse_input_line(line: str) -> tuple[str, str | None]:
     return line.strip(), None
 
 
-def write_validated_yaml(output: Path, validated: list[tuple], players: list[dict]):
+def write_validated_yaml(output: Path, validated: list[tuple], players: list[Player]):
     # validated: list of (name, position, price, player_id, team_id, team_name)
     # Use PyYAML to produce a structured YAML document for easier consumption later.
     # Output structure:
@@ -155,18 +381,7 @@ def write_validated_yaml(output: Path, validated: list[tuple], players: list[dic
     #     price: <float>
     #     team_id: <int>
     #     team_name: <string>
-    def norm_full_name(first_name: str, second_name: str) -> str:
-        import unicodedata
-        import re
-
-        full = f"{first_name} {second_name}".strip()
-        s = unicodedata.normalize("NFKD", full)
-        s = "".join(ch for ch in s if not unicodedata.combining(ch))
-        s = s.lower()
-        s = re.sub(r"\s+", "_", s)
-        s = re.sub(r"[^a-z0-9_]", "", s)
-        return s
-
+    players_by_id = {p.id: p for p in players}
     out = {"team": {}}
     for entry in validated:
         # unpack with safety for older formats
@@ -192,20 +407,9 @@ def write_validated_yaml(output: Path, validated: list[tuple], players: list[dic
             # But since we don't, fallback to normalized name string
             norm_name = None
             if pid is not None:
-                # Find player in players list by id
-                player = None
-                # Use the global 'players' list if available
-                try:
-                    for p in players:
-                        if p.get("id") == pid:
-                            player = p
-                            break
-                except Exception:
-                    player = None
+                player = players_by_id.get(pid)
                 if player:
-                    norm_name = norm_full_name(
-                        player.get("first_name", ""), player.get("second_name", "")
-                    )
+                    norm_name = norm_full_name(player.first_name, player.second_name)
             if not norm_name:
                 norm_name = norm_full_name(name, "")
         out_name = name
@@ -217,22 +421,8 @@ def write_validated_yaml(output: Path, validated: list[tuple], players: list[dic
             "team_name": team_name,
             "norm_full_name": norm_name,
         }
-    try:
-        yaml.safe_dump(out, output.open("w", encoding="utf8"), sort_keys=False)
-    except Exception:
-        # fallback to manual writing if PyYAML fails for some reason
-        with output.open("w", encoding="utf8") as fh:
-            fh.write("team:\n")
-            for name, pos, price, pid, team_id, team_name in validated:
-                safe_name = name
-                if ":" in name or name.startswith((" ", "-", "?")):
-                    safe_name = f"'{name}'"
-                fh.write(f"  {safe_name}:\n")
-                fh.write(f"    id: {pid}\n")
-                fh.write(f"    position: {pos}\n")
-                fh.write(f"    price: {price:.1f}\n")
-                fh.write(f"    team_id: {team_id}\n")
-                fh.write(f"    team_name: '{team_name}'\n")
+    with output.open("w", encoding="utf8") as fh:
+        yaml.dump(out, fh, Dumper=_YAML_DUMPER, sort_keys=False)
 
 
 def main():
@@ -271,9 +461,8 @@ def main():
         print(f"Input team file not found: {ipath}", file=sys.stderr)
         sys.exit(2)
 
-    bootstrap = json.loads(bpath.read_text(encoding="utf8"))
-    players = build_players_index(bootstrap)
-    team_list = read_team_input(ipath)
+    players, indexes = load_index_cached(bpath)
+    team_list = parse_team_input(ipath.read_text(encoding="utf8"))
     if not team_list:
         print("No players found in input file.", file=sys.stderr)
         sys.exit(2)
@@ -281,9 +470,9 @@ def main():
     validated = []
     missing = []
     ambiguous = []
-    for raw_line in team_list:
-        candidate, team_hint = parse_input_line(raw_line)
-        matches = match_candidate_with_team(candidate, team_hint, players)
+    fuzzy = []
+    for candidate, team_hint in team_list:
+        matches = match_candidate_with_team(candidate, team_hint, players, indexes)
         if len(matches) == 0:
             missing.append(candidate)
         elif len(matches) > 1:
@@ -291,29 +480,36 @@ def main():
                 (
                     candidate,
                     [
-                        f"{m['first_name']} {m['second_name']} ({m['web_name']})"
+                        f"{m.first_name} {m.second_name} ({m.web_name})"
                         for m in matches
                     ],
                 )
             )
         else:
             p = matches[0]
+            if is_fuzzy_match(candidate, indexes):
+                fuzzy.append(f"{candidate} -> {p.first_name} {p.second_name}")
             price = (
-                (p["now_cost"] / 10.0)
-                if isinstance(p["now_cost"], (int, float))
+                (p.now_cost / 10.0)
+                if isinstance(p.now_cost, (int, float))
                 else None
             )
             validated.append(
                 (
                     candidate,
-                    p["position"] or "UNKNOWN",
+                    p.position or "UNKNOWN",
                     price if price is not None else 0.0,
-                    p.get("id"),
-                    p.get("team_id"),
-                    p.get("team_name") or "",
+                    p.id,
+                    p.team_id,
+                    p.team_name or "",
                 )
             )
 
+    if fuzzy:
+        print("Fuzzy matches (no exact name found):", file=sys.stderr)
+        for f in fuzzy:
+            print("  " + f, file=sys.stderr)
+
     if missing or ambiguous:
         if missing:
             print("Missing players (not found in bootstrap):", file=sys.stderr)
@@ -330,15 +526,19 @@ def main():
         # validated_list: entries with (name, position, price, pid, team_id, team_name)
         report = {"violations": [], "summary": {}}
         total_players = len(validated_list)
-        total_cost = sum((p[2] or 0.0) for p in validated_list)
-        # count positions
-        counts = {"GKP": 0, "DEF": 0, "MID": 0, "FWD": 0, "UNKNOWN": 0}
-        club_counts = {}
-        for entry in validated_list:
-            _, pos, price, pid, team_id, team_name = entry
-            counts[pos] = counts.get(pos, 0) + 1
+        # total cost, position and club counts in one pass
+        total_cost = 0.0
+        pos_counts = Counter()
+        club_counts = Counter()
+        for _, pos, price, _, team_id, _ in validated_list:
+            total_cost += price or 0.0
+            pos_counts[pos] += 1
             if team_id is not None:
-                club_counts[team_id] = club_counts.get(team_id, 0) + 1
+                club_counts[team_id] += 1
+        # fixed keys first so the summary always lists every position
+        counts = {k: pos_counts[k] for k in ("GKP", "DEF", "MID", "FWD", "UNKNOWN")}
+        counts.update(pos_counts)
+        club_counts = dict(club_counts)
 
         report["summary"] = {
             "total_players": total_players,
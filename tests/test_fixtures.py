@@ -0,0 +1,59 @@
+from datetime import datetime
+
+import myfpl.fixtures as F
+
+
+def test_parse_kickoff_canonical_matches_datetime_roundtrip():
+    iso = "2024-08-16T19:00:00Z"
+    expected = datetime.fromisoformat(iso.replace("Z", "+00:00")).isoformat()
+    assert F.parse_kickoff(iso) == expected
+
+
+def test_parse_kickoff_non_canonical():
+    assert F.parse_kickoff("2024-08-16T19:00:00+01:00") == "2024-08-16T19:00:00+01:00"
+    assert F.parse_kickoff("not a date") == "not a date"
+
+
+def test_build_fixtures_map():
+    fmap = F.build_fixtures_map([
+        {"id": 1, "event": 1, "kickoff_time": "2024-08-16T19:00:00Z", "team_h": 14, "team_a": 9},
+        {"id": 2, "event": None, "kickoff_time": None, "team_h": 1, "team_a": 2},
+    ])
+    assert fmap[1] == {"event": 1, "kickoff_time": "2024-08-16T19:00:00+00:00", "team_h": 14, "team_a": 9}
+    assert fmap[2]["kickoff_time"] is None
+
+
+def test_get_fixtures_map_reuses_fresh_file(tmp_path, monkeypatch):
+    (tmp_path / "fixtures.json").write_text(
+        '[{"id": 7, "event": 3, "kickoff_time": "2024-08-16T19:00:00Z", "team_h": 1, "team_a": 2}]',
+        encoding="utf-8",
+    )
+
+    def no_network(url):
+        raise AssertionError(f"unexpected fetch of {url}")
+
+    monkeypatch.setattr(F, "fetch_json", no_network)
+    fmap = F.get_fixtures_map(str(tmp_path))
+    assert fmap[7]["event"] == 3
+    assert F.get_fixtures_map(str(tmp_path)) is fmap
+
+
+def test_get_fixtures_map_refetches_over_parsed_map(tmp_path, monkeypatch):
+    # `fixtures.py --output fixtures.json` leaves a parsed map, not the raw list
+    (tmp_path / "fixtures.json").write_text(
+        '{"7": {"event": 3, "kickoff_time": null, "team_h": 1, "team_a": 2}}',
+        encoding="utf-8",
+    )
+    fetched = []
+
+    def fake_fetch(url):
+        fetched.append(url)
+        return [{"id": 8, "event": 4, "kickoff_time": None, "team_h": 1, "team_a": 2}]
+
+    monkeypatch.setattr(F, "fetch_json", fake_fetch)
+    fmap = F.get_fixtures_map(str(tmp_path))
+    assert len(fetched) == 1
+    assert fmap[8]["event"] == 4
+    # the raw list replaces the parsed map, with no temp file left behind
+    assert [p.name for p in tmp_path.iterdir()] == ["fixtures.json"]
+    assert F._read_fixtures(str(tmp_path / "fixtures.json"))[0]["id"] == 8
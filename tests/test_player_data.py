@@ -0,0 +1,77 @@
+import myfpl.player_data as PD
+
+
+def make_sample_bootstrap():
+    return {
+        "element_types": [
+            {"id": 2, "singular_name": "Defender", "singular_name_short": "DEF"},
+            {"id": 3, "singular_name": "Midfielder", "singular_name_short": "MID"},
+        ],
+        "teams": [
+            {"id": 1, "name": "Arsenal", "short_name": "ARS", "code": 3},
+            {"id": 15, "name": "Newcastle", "short_name": "NEW", "code": 4},
+        ],
+        "elements": [
+            {"id": 11, "first_name": "Benjamin", "second_name": "White",
+             "web_name": "White", "element_type": 2, "team": 1},
+            {"id": 498, "first_name": "Joe", "second_name": "White",
+             "web_name": "White", "element_type": 3, "team": 15},
+            {"id": 21, "first_name": "Bukayo", "second_name": "Saka",
+             "web_name": "Saka", "element_type": 3, "team": 1},
+        ],
+    }
+
+
+def test_find_players_exact():
+    bs = make_sample_bootstrap()
+    matches = PD.find_players(bs, "White")
+    assert [el["id"] for el in matches] == [11, 498]
+
+
+def test_find_players_substring():
+    bs = make_sample_bootstrap()
+    index = PD.build_name_index(bs)
+    assert [el["id"] for el in PD.find_players(bs, "kayo sa", index)] == [21]
+    assert [el["id"] for el in PD.find_players(bs, "ka", index)] == [21]
+
+
+def test_find_players_fuzzy():
+    bs = make_sample_bootstrap()
+    assert [el["id"] for el in PD.find_players(bs, "Bukayo Sakka")] == [21]
+    assert PD.find_players(bs, "Haaland") == []
+
+
+def test_find_players_ignores_diacritics():
+    bs = make_sample_bootstrap()
+    bs["elements"].append(
+        {"id": 1, "first_name": "David", "second_name": "Raya Martín",
+         "web_name": "Raya", "element_type": 1, "team": 1}
+    )
+    index = PD.build_name_index(bs)
+    assert [el["id"] for el in PD.find_players(bs, "Raya Martin", index)] == [1]
+    assert [el["id"] for el in PD.find_players(bs, "david raya martín", index)] == [1]
+
+
+def test_find_players_absent_name_stays_unmatched(monkeypatch):
+    bs = make_sample_bootstrap()
+    # rapidfuzz (when installed), then the difflib fallback
+    for process in (PD.process, None):
+        monkeypatch.setattr(PD, "process", process)
+        # a fresh index each time, so the fuzzy memo can't answer for the other backend
+        index = PD.build_name_index(bs)
+        for query in ("Kane", "Rooney", "Haaland"):
+            assert PD.find_players(bs, query, index) == []
+
+
+def test_find_players_memoizes_fuzzy_lookups(monkeypatch):
+    bs = make_sample_bootstrap()
+    index = PD.build_name_index(bs)
+    assert [el["id"] for el in PD.find_players(bs, "Bukayo Sakka", index)] == [21]
+    assert PD.find_players(bs, "Haaland", index) == []
+
+    def no_scoring(query, candidates):
+        raise AssertionError(f"unexpected fuzzy scoring of {query!r}")
+
+    monkeypatch.setattr(PD, "_closest_name", no_scoring)
+    assert [el["id"] for el in PD.find_players(bs, "bukayo sakka", index)] == [21]
+    assert PD.find_players(bs, "Haaland", index) == []
@@ -73,3 +73,94 @@ def test_match_candidate_and_team_disambiguation():
 
 def test_normalize_variants():
     assert V.normalize("J.Timber") == V.normalize("J Timber")
+
+
+def test_match_candidate_initial_form():
+    bs = make_sample_bootstrap()
+    players = V.build_players_index(bs)
+    indexes = V.build_name_indexes(players)
+    assert [p["id"] for p in V.match_candidate("B. White", players, indexes)] == [11]
+    assert [p["id"] for p in V.match_candidate("J White", players, indexes)] == [498]
+    assert [p["id"] for p in V.match_candidate("David Raya Martin", players, indexes)] == [1]
+
+
+def test_load_index_cached_roundtrip(tmp_path, monkeypatch):
+    import json
+
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(V, "INDEX_CACHE_DIR", cache_dir)
+    bpath = tmp_path / "bootstrap.json"
+    bpath.write_text(json.dumps(make_sample_bootstrap()), encoding="utf8")
+    players, indexes = V.load_index_cached(bpath)
+    assert len(list(cache_dir.glob("players-*.pkl"))) == 1
+
+    def no_rebuild(bootstrap):
+        raise AssertionError("cache hit should not rebuild the index")
+
+    monkeypatch.setattr(V, "build_players_index", no_rebuild)
+    cached_players, cached_indexes = V.load_index_cached(bpath)
+    assert cached_players == players
+    assert cached_indexes == indexes
+
+
+def test_match_candidate_with_team_short_name_and_code():
+    bs = make_sample_bootstrap()
+    players = V.build_players_index(bs)
+    indexes = V.build_name_indexes(players)
+    assert [p["id"] for p in V.match_candidate_with_team("White", "ars", players, indexes)] == [11]
+    assert [p["id"] for p in V.match_candidate_with_team("White", "4", players, indexes)] == [498]
+    # an unknown team hint leaves the name matches untouched, in bootstrap order
+    assert [p["id"] for p in V.match_candidate_with_team("White", "Spurs", players, indexes)] == [11, 498]
+
+
+@pytest.mark.parametrize("use_rapidfuzz", [True, False])
+def test_match_candidate_fuzzy_fallback(monkeypatch, capsys, use_rapidfuzz):
+    if not use_rapidfuzz:
+        monkeypatch.setattr(V, "process", None)
+    elif V.process is None:
+        pytest.skip("rapidfuzz not installed")
+    bs = make_sample_bootstrap()
+    players = V.build_players_index(bs)
+    indexes = V.build_name_indexes(players)
+    assert [p["id"] for p in V.match_candidate("Benjamin Whte", players, indexes)] == [11]
+    assert V.is_fuzzy_match("Benjamin Whte", indexes)
+    assert not V.is_fuzzy_match("B. White", indexes)
+    # reporting the substitution is left to main()
+    assert capsys.readouterr().err == ""
+    assert V.match_candidate("Haaland", players, indexes) == []
+    # both scorers compare the names as written, so reordered tokens miss
+    assert V.match_candidate("Saka Bukayo", players, indexes) == []
+
+
+def test_player_supports_dict_style_access():
+    players = V.build_players_index(make_sample_bootstrap())
+    p = players[0]
+    assert p["id"] == p.id == 11
+    assert p.get("team_name") == "Arsenal"
+    assert p.get("missing", "x") == "x"
+    with pytest.raises(KeyError):
+        p["missing"]
+
+
+def test_parse_team_input_matches_line_parser():
+    text = "Harry Kane\n\n  White ; Arsenal \n   \n; Spurs\nSaka;\nA; B; C\n"
+    expected = [
+        V.parse_input_line(line) for line in text.splitlines() if line.strip()
+    ]
+    assert V.parse_team_input(text) == expected
+    assert expected[1] == ("White", "Arsenal")
+
+
+def test_match_candidate_unique_exact_hit_wins_over_initial_form():
+    bs = make_sample_bootstrap()
+    bs["elements"] += [
+        {"id": 5, "first_name": "Jurriën", "second_name": "Timber",
+         "web_name": "J.Timber", "element_type": 2, "now_cost": 55, "team": 1},
+        {"id": 6, "first_name": "Jan", "second_name": "Timber",
+         "web_name": "Timber", "element_type": 3, "now_cost": 45, "team": 15},
+    ]
+    players = V.build_players_index(bs)
+    indexes = V.build_name_indexes(players)
+    assert [p["id"] for p in V.match_candidate("J.Timber", players, indexes)] == [5]
+    # several exact hits are all returned
+    assert [p["id"] for p in V.match_candidate("Timber", players, indexes)] == [5, 6]